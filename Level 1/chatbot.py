@@ -9,9 +9,12 @@ Behavior:
 - Logs all interactions to logs/level1_log.txt
 """
 
+import atexit
+import hashlib
 import os
-import re
+import shelve
 import sys
+import time
 from datetime import datetime
 
 # ------------- Minimal optional OpenAI wiring -------------
@@ -26,79 +29,175 @@ def call_openai_llm(system_prompt: str, user_prompt: str) -> str:
         return local_llm_mock(user_prompt)
 
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)  # type: ignore
-        # GPT-4o-mini/4.1-mini are economical options; change as needed.
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role":"system","content":system_prompt},
-                {"role":"user","content":user_prompt}
-            ],
-            temperature=0.2,
-        )
-        return resp.choices[0].message.content.strip()
+        return chat_completion(api_key, system_prompt, user_prompt)
     except Exception as e:
         return f"[LLM Error / fallback mock] {local_llm_mock(user_prompt)}"
 
+_CLIENTS = {}
+
+def _openai_client(api_key: str):
+    # Reuse one client per key so its HTTP connection pool (keep-alive) survives between calls.
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        from openai import OpenAI
+        client = _CLIENTS[api_key] = OpenAI(api_key=api_key)  # type: ignore
+    return client
+
+# GPT-4o-mini/4.1-mini are economical options; change as needed.
+MODEL = "gpt-4o-mini"
+
+CACHE_PATH = os.path.join(".cache", "llm")
+CACHE_TTL = 24 * 60 * 60  # seconds
+_CACHE = None  # the open shelf, or False once opening it has failed
+
+# The disk cache is best-effort: if it can't be opened (unwritable directory, store locked by another
+# instance, corrupt file) or read/written, the LLM is simply called without it.
+def _response_cache():
+    global _CACHE
+    if _CACHE is None:
+        try:
+            os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+            _CACHE = shelve.open(CACHE_PATH)
+        except Exception:
+            _CACHE = False  # don't retry on every call
+        else:
+            atexit.register(_CACHE.close)
+    return None if _CACHE is False else _CACHE
+
+def _cache_get(key: str):
+    cache = _response_cache()
+    if cache is None:
+        return None
+    try:
+        hit = cache.get(key)
+        if hit is not None and time.time() - hit[0] >= CACHE_TTL:
+            del cache[key]  # expired: drop it rather than keep it on disk
+            hit = None
+    except Exception:
+        return None
+    return None if hit is None else hit[1]
+
+def _cache_put(key: str, text: str) -> None:
+    cache = _response_cache()
+    if cache is None:
+        return
+    try:
+        cache[key] = (time.time(), text)
+    except Exception:
+        pass
+
+def chat_completion(api_key: str, system_prompt: str, user_prompt: str) -> str:
+    # Responses persist on disk for CACHE_TTL, so repeated prompts skip the network even after a restart.
+    # API errors propagate and are never cached.
+    key = hashlib.sha1(f"{MODEL}\0{system_prompt}\0{user_prompt}".encode("utf-8", "surrogatepass")).hexdigest()
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    client = _openai_client(api_key)
+    resp = client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role":"system","content":system_prompt},
+            {"role":"user","content":user_prompt}
+        ],
+        temperature=0.2,
+    )
+    text = resp.choices[0].message.content.strip()
+    _cache_put(key, text)
+    return text
+
 # ------------- Simple mock "LLM" for offline use -------------
+def format_step_by_step(steps, final_answer) -> str:
+    # steps may be any iterable (list or tuple); everything is joined in a single pass.
+    numbered = (f"{i}. {s}" for i, s in enumerate(steps, 1))
+    return "\n".join(("Step-by-step reasoning:", *numbered, "—", f"Answer: {final_answer}"))
+
+# Very small knowledge for demo purposes. The replies never change, so they are formatted once at import.
+MOCK_RESPONSES = {
+    "colors in a rainbow": format_step_by_step(
+        ("Recall the acronym VIBGYOR.",
+         "List each color from longest to shortest wavelength.",
+         "Provide a brief reason it's seen in that order."),
+        "- Violet\n- Indigo\n- Blue\n- Green\n- Yellow\n- Orange\n- Red"),
+    "why the sky is blue": format_step_by_step(
+        ("Sunlight contains many wavelengths.",
+         "Air molecules scatter shorter wavelengths more efficiently (Rayleigh scattering).",
+         "Blue light (shorter wavelength) is scattered across the sky and reaches our eyes."),
+        "Because shorter wavelengths (blue) scatter more in the atmosphere (Rayleigh scattering)."),
+    "which planet is the hottest": format_step_by_step(
+        ("Compare average surface temperatures of planets.",
+         "Note that Venus has a runaway greenhouse effect.",
+         "Conclude the hottest planet is Venus."),
+        "Venus is the hottest planet in our solar system due to an extreme greenhouse effect."),
+}
+# Default structure for anything else
+DEFAULT_RESPONSE = format_step_by_step(
+    ("Identify the core question.",
+     "Recall relevant facts.",
+     "Synthesize a concise, structured answer."),
+    "Here is a clear, structured answer to your question.")
+
 def local_llm_mock(user_prompt: str) -> str:
-    # Very small knowledge for demo purposes
     lower = user_prompt.lower()
-    if "colors in a rainbow" in lower:
-        steps = [
-            "Recall the acronym VIBGYOR.",
-            "List each color from longest to shortest wavelength.",
-            "Provide a brief reason it's seen in that order."
-        ]
-        answer = "- Violet\n- Indigo\n- Blue\n- Green\n- Yellow\n- Orange\n- Red"
-        return format_step_by_step(steps, answer)
-    if "why the sky is blue" in lower:
-        steps = [
-            "Sunlight contains many wavelengths.",
-            "Air molecules scatter shorter wavelengths more efficiently (Rayleigh scattering).",
-            "Blue light (shorter wavelength) is scattered across the sky and reaches our eyes."
-        ]
-        answer = "Because shorter wavelengths (blue) scatter more in the atmosphere (Rayleigh scattering)."
-        return format_step_by_step(steps, answer)
-    if "which planet is the hottest" in lower:
-        steps = [
-            "Compare average surface temperatures of planets.",
-            "Note that Venus has a runaway greenhouse effect.",
-            "Conclude the hottest planet is Venus."
-        ]
-        answer = "Venus is the hottest planet in our solar system due to an extreme greenhouse effect."
-        return format_step_by_step(steps, answer)
-    # default structure
-    steps = [
-        "Identify the core question.",
-        "Recall relevant facts.",
-        "Synthesize a concise, structured answer."
-    ]
-    answer = "Here is a clear, structured answer to your question."
-    return format_step_by_step(steps, answer)
-
-def format_step_by_step(steps, final_answer) -> str:
-    lines = ["Step-by-step reasoning:"]
-    for i, s in enumerate(steps, 1):
-        lines.append(f"{i}. {s}")
-    lines.append("—")
-    lines.append(f"Answer: {final_answer}")
-    return "\n".join(lines)
+    for key, response in MOCK_RESPONSES.items():
+        if key in lower:
+            return response
+    return DEFAULT_RESPONSE
 
 # ------------- Math detection -------------
-MATH_PATTERN = re.compile(r"^\s*([-+/*]|\d|\s|what\s+is|add|plus|minus|times|multiply|multiplied|divided|sum|difference|product|quotient)+\?*\s*$", re.IGNORECASE)
+MATH_OPERATORS = frozenset("+-*/")
+MATH_WORDS = ("add", "plus", "minus", "times", "multiply", "multiplied", "divided",
+              "sum", "difference", "product", "quotient")
 
 def is_direct_math(query: str) -> bool:
     # Treat as direct math if the query is mostly an arithmetic statement or explicitly asks for a calculation.
-    return bool(MATH_PATTERN.match(query.strip()))
+    # The query must consist only of digits, operators, whitespace, "what is" and MATH_WORDS, optionally
+    # followed by question marks. No token is a prefix of another, so one left-to-right scan decides it.
+    s = query.strip().lower().rstrip("?")
+    i, n = 0, len(s)
+    if not n:
+        return False
+    while i < n:
+        c = s[i]
+        if c in MATH_OPERATORS or c.isdecimal() or c.isspace():
+            i += 1
+        elif s.startswith("what", i):
+            j = i + 4
+            while j < n and s[j].isspace():
+                j += 1
+            if j == i + 4 or not s.startswith("is", j):
+                return False
+            i = j + 2
+        elif not s.startswith(MATH_WORDS, i):
+            # Cheap rejection for ordinary questions: one C-level prefix test against all words.
+            return False
+        else:
+            for word in MATH_WORDS:
+                if s.startswith(word, i):
+                    i += len(word)
+                    break
+    return True
 
 # ------------- Logging -------------
+_LOG_HANDLES = {}
+
+def _log_handle(path):
+    # One handle per log file, kept open for the whole session (no open/close per turn).
+    f = _LOG_HANDLES.get(path)
+    if f is None:
+        log_dir = os.path.dirname(path)
+        if log_dir:  # a bare file name logs to the current directory
+            os.makedirs(log_dir, exist_ok=True)
+        f = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+        atexit.register(f.close)
+        _LOG_HANDLES[path] = f
+    return f
+
 def log_interaction(path, user, assistant):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(f"[{datetime.now().isoformat(timespec='seconds')}] USER: {user}\n")
-        f.write(f"[{datetime.now().isoformat(timespec='seconds')}] ASSISTANT: {assistant}\n\n")
+    f = _log_handle(path)
+    ts = datetime.now().isoformat(timespec='seconds')
+    f.write(f"[{ts}] USER: {user}\n[{ts}] ASSISTANT: {assistant}\n\n")
+    f.flush()  # one write syscall per turn, so a killed terminal doesn't lose the transcript
 
 # ------------- CLI -------------
 SYSTEM_PROMPT = """You are a helpful assistant. Always think step-by-step and present a clear, numbered reasoning list followed by a short final answer starting with 'Answer:'. If the user asks for arithmetic like '15 + 23', do NOT compute; instead, politely refuse and suggest using a calculator tool."""
@@ -6,6 +6,7 @@ Also exposes a safe_eval for basic 'a op b' forms for demo.
 
 import operator
 import re
+from functools import lru_cache
 from typing import Tuple
 
 OPS = {
@@ -26,6 +27,7 @@ def parse_simple(expr: str) -> Tuple[float, str, float]:
     a, op, b = m.groups()
     return float(a), op, float(b)
 
+@lru_cache(maxsize=1024)
 def calculate(expr: str) -> float:
     a, op, b = parse_simple(expr)
     func = OPS.get(op)
@@ -38,3 +40,13 @@ def add(a: float, b: float) -> float:
 
 def multiply(a: float, b: float) -> float:
     return a * b
+
+# Bulk variants for batch runs. NumPy already vectorizes these; the rest of the agent is
+# string/regex work, which Numba cannot compile in nopython mode, so no JIT is used anywhere.
+def add_bulk(a, b):
+    import numpy as np  # optional: pip install numpy
+    return np.add(a, b)
+
+def multiply_bulk(a, b):
+    import numpy as np  # optional: pip install numpy
+    return np.multiply(a, b)
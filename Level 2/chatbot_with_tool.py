@@ -8,8 +8,12 @@ Behavior:
 - Logs all interactions to logs/level2_log.txt
 """
 
+import atexit
+import hashlib
 import os
 import re
+import shelve
+import time
 from datetime import datetime
 
 import calculator_tool
@@ -20,20 +24,82 @@ def call_openai_llm(system_prompt: str, user_prompt: str) -> str:
     if not api_key:
         return local_llm_mock(user_prompt)
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)  # type: ignore
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role":"system","content":system_prompt},
-                {"role":"user","content":user_prompt}
-            ],
-            temperature=0.2,
-        )
-        return resp.choices[0].message.content.strip()
+        return chat_completion(api_key, system_prompt, user_prompt)
     except Exception as e:
         return f"[LLM Error / fallback mock] {local_llm_mock(user_prompt)}"
 
+_CLIENTS = {}
+
+def _openai_client(api_key: str):
+    # Reuse one client per key so its HTTP connection pool (keep-alive) survives between calls.
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        from openai import OpenAI
+        client = _CLIENTS[api_key] = OpenAI(api_key=api_key)  # type: ignore
+    return client
+
+MODEL = "gpt-4o-mini"
+
+CACHE_PATH = os.path.join(".cache", "llm")
+CACHE_TTL = 24 * 60 * 60  # seconds
+_CACHE = None  # the open shelf, or False once opening it has failed
+
+# The disk cache is best-effort: if it can't be opened (unwritable directory, store locked by another
+# instance, corrupt file) or read/written, the LLM is simply called without it.
+def _response_cache():
+    global _CACHE
+    if _CACHE is None:
+        try:
+            os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+            _CACHE = shelve.open(CACHE_PATH)
+        except Exception:
+            _CACHE = False  # don't retry on every call
+        else:
+            atexit.register(_CACHE.close)
+    return None if _CACHE is False else _CACHE
+
+def _cache_get(key: str):
+    cache = _response_cache()
+    if cache is None:
+        return None
+    try:
+        hit = cache.get(key)
+        if hit is not None and time.time() - hit[0] >= CACHE_TTL:
+            del cache[key]  # expired: drop it rather than keep it on disk
+            hit = None
+    except Exception:
+        return None
+    return None if hit is None else hit[1]
+
+def _cache_put(key: str, text: str) -> None:
+    cache = _response_cache()
+    if cache is None:
+        return
+    try:
+        cache[key] = (time.time(), text)
+    except Exception:
+        pass
+
+def chat_completion(api_key: str, system_prompt: str, user_prompt: str) -> str:
+    # Responses persist on disk for CACHE_TTL, so repeated prompts skip the network even after a restart.
+    # API errors propagate and are never cached.
+    key = hashlib.sha1(f"{MODEL}\0{system_prompt}\0{user_prompt}".encode("utf-8", "surrogatepass")).hexdigest()
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    client = _openai_client(api_key)
+    resp = client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role":"system","content":system_prompt},
+            {"role":"user","content":user_prompt}
+        ],
+        temperature=0.2,
+    )
+    text = resp.choices[0].message.content.strip()
+    _cache_put(key, text)
+    return text
+
 def local_llm_mock(user_prompt: str) -> str:
     return "Answer: " + ("Paris" if "capital of france" in user_prompt.lower() else "Here is a concise answer.")
 
@@ -41,44 +107,63 @@ SYSTEM_PROMPT = """You are a helpful assistant. For non-math questions, answer c
 
 # --- Detection helpers ---
 MATH_KEYWORDS = re.compile(r"\b(add|plus|sum|times|multiply|multiplied|product|minus|difference|divided|/|\*|\+|\-|\bx\b|×)\b", re.IGNORECASE)
+# "a op b" (case-sensitive, like the calculator) or any math keyword, tested in a single search.
+LOOKS_LIKE_MATH = re.compile(rf"{calculator_tool.NUM_OP_NUM.pattern}|(?i:{MATH_KEYWORDS.pattern})")
+NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
 
 def looks_like_math(q: str) -> bool:
     # If the query mentions clear math keywords or looks like "a op b"
-    if calculator_tool.NUM_OP_NUM.match(q.strip()):
-        return True
-    return bool(MATH_KEYWORDS.search(q))
+    return bool(LOOKS_LIKE_MATH.search(q))
+
+# "what is the capital of" / "tell me the capital" are covered by "capital", so two scans suffice.
+FACT_KEYWORDS = ("capital", "who is")
 
-def is_mixed_query(q: str) -> bool:
+def is_mixed_query(lower: str, has_math: bool) -> bool:
     # crude heuristic: asks both math and non-math facts
-    has_math = looks_like_math(q)
-    has_fact = any(k in q.lower() for k in ["capital", "who is", "what is the capital of", "tell me the capital"])
-    return has_math and has_fact
+    # Takes the already-lowered query and looks_like_math() result so callers compute them once.
+    return has_math and any(k in lower for k in FACT_KEYWORDS)
+
+_LOG_HANDLES = {}
+
+def _log_handle(path):
+    # One handle per log file, kept open for the whole session (no open/close per turn).
+    f = _LOG_HANDLES.get(path)
+    if f is None:
+        log_dir = os.path.dirname(path)
+        if log_dir:  # a bare file name logs to the current directory
+            os.makedirs(log_dir, exist_ok=True)
+        f = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+        atexit.register(f.close)
+        _LOG_HANDLES[path] = f
+    return f
 
 def log(path, user, assistant):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(f"[{datetime.now().isoformat(timespec='seconds')}] USER: {user}\n")
-        f.write(f"[{datetime.now().isoformat(timespec='seconds')}] ASSISTANT: {assistant}\n\n")
+    f = _log_handle(path)
+    ts = datetime.now().isoformat(timespec='seconds')
+    f.write(f"[{ts}] USER: {user}\n[{ts}] ASSISTANT: {assistant}\n\n")
+    f.flush()  # one write syscall per turn, so a killed terminal doesn't lose the transcript
 
 def handle_query(q: str) -> str:
-    if is_mixed_query(q):
+    expr = q.strip()
+    lower = expr.lower()
+    has_math = looks_like_math(expr)
+    if is_mixed_query(lower, has_math):
         return "I can do a single task at a time at Level 2. Multi-step mixed queries aren't supported yet."
-    if looks_like_math(q):
+    if has_math:
         # try explicit patterns first
-        m = calculator_tool.NUM_OP_NUM.match(q.strip())
+        m = calculator_tool.NUM_OP_NUM.match(expr)
         try:
             if m:
-                result = calculator_tool.calculate(q)
+                result = calculator_tool.calculate(expr)
                 return f"Calculator result: {result:g}"
             # basic verb patterns
-            lower = q.lower()
             if "times" in lower or "multiply" in lower or "multiplied" in lower:
                 # extract two numbers
-                nums = [float(x) for x in re.findall(r"-?\d+(?:\.\d+)?", q)]
+                nums = [float(x) for x in NUMBER.findall(q)]
                 if len(nums) >= 2:
                     return f"Calculator result: {calculator_tool.multiply(nums[0], nums[1]):g}"
             if "add" in lower or "plus" in lower or "sum" in lower:
-                nums = [float(x) for x in re.findall(r"-?\d+(?:\.\d+)?", q)]
+                nums = [float(x) for x in NUMBER.findall(q)]
                 if len(nums) >= 2:
                     return f"Calculator result: {calculator_tool.add(nums[0], nums[1]):g}"
         except Exception as e:
@@ -7,10 +7,16 @@ Level 3 — Full Agentic AI with multi-step tasks.
 - Log full history to logs/level3_log.txt
 """
 
+import atexit
+import hashlib
 import os
 import re
+import shelve
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 import calculator_tool
 import translator_tool
@@ -21,70 +27,152 @@ def call_openai_llm(system_prompt: str, user_prompt: str) -> str:
     if not api_key:
         return local_llm_mock(user_prompt)
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)  # type: ignore
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role":"system","content":system_prompt},
-                {"role":"user","content":user_prompt}
-            ],
-            temperature=0.2,
-        )
-        return resp.choices[0].message.content.strip()
+        return chat_completion(api_key, system_prompt, user_prompt)
     except Exception:
         return local_llm_mock(user_prompt)
 
+_CLIENTS = {}
+
+def _openai_client(api_key: str):
+    # Reuse one client per key so its HTTP connection pool (keep-alive) survives between calls.
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        from openai import OpenAI
+        client = _CLIENTS[api_key] = OpenAI(api_key=api_key)  # type: ignore
+    return client
+
+MODEL = "gpt-4o-mini"
+
+CACHE_PATH = os.path.join(".cache", "llm")
+CACHE_TTL = 24 * 60 * 60  # seconds
+_CACHE = None  # the open shelf, or False once opening it has failed
+_CACHE_LOCK = threading.Lock()  # run_steps calls the LLM from worker threads; shelve isn't thread-safe
+
+# The disk cache is best-effort: if it can't be opened (unwritable directory, store locked by another
+# instance, corrupt file) or read/written, the LLM is simply called without it.
+def _response_cache():
+    global _CACHE
+    if _CACHE is None:
+        try:
+            os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+            _CACHE = shelve.open(CACHE_PATH)
+        except Exception:
+            _CACHE = False  # don't retry on every call
+        else:
+            atexit.register(_CACHE.close)
+    return None if _CACHE is False else _CACHE
+
+def _cache_get(key: str):
+    with _CACHE_LOCK:
+        cache = _response_cache()
+        if cache is None:
+            return None
+        try:
+            hit = cache.get(key)
+            if hit is not None and time.time() - hit[0] >= CACHE_TTL:
+                del cache[key]  # expired: drop it rather than keep it on disk
+                hit = None
+        except Exception:
+            return None
+        return None if hit is None else hit[1]
+
+def _cache_put(key: str, text: str) -> None:
+    with _CACHE_LOCK:
+        cache = _response_cache()
+        if cache is None:
+            return
+        try:
+            cache[key] = (time.time(), text)
+        except Exception:
+            pass
+
+def chat_completion(api_key: str, system_prompt: str, user_prompt: str) -> str:
+    # Responses persist on disk for CACHE_TTL, so repeated prompts skip the network even after a restart.
+    # API errors propagate and are never cached.
+    key = hashlib.sha1(f"{MODEL}\0{system_prompt}\0{user_prompt}".encode("utf-8", "surrogatepass")).hexdigest()
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    client = _openai_client(api_key)
+    resp = client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role":"system","content":system_prompt},
+            {"role":"user","content":user_prompt}
+        ],
+        temperature=0.2,
+    )
+    text = resp.choices[0].message.content.strip()
+    _cache_put(key, text)
+    return text
+
+MOCK_ANSWERS = {
+    "capital of italy": "Rome",
+    "distance between earth and mars": "It varies widely (about 54.6 million km at closest to over 400 million km).",
+}
+
 def local_llm_mock(prompt: str) -> str:
-    if "capital of italy" in prompt.lower():
-        return "Rome"
-    if "distance between earth and mars" in prompt.lower():
-        return "It varies widely (about 54.6 million km at closest to over 400 million km)."
+    lower = prompt.lower()
+    for key, answer in MOCK_ANSWERS.items():
+        if key in lower:
+            return answer
     return "Here is a concise answer."
 
 SYSTEM_PROMPT = "You are an agent that completes multi-step tasks by describing each step and keeping a brief memory."
 
 # --- Utilities ---
+_LOG_HANDLES = {}
+
+def _log_handle(path):
+    # One handle per log file, kept open for the whole session (no open/close per turn).
+    f = _LOG_HANDLES.get(path)
+    if f is None:
+        log_dir = os.path.dirname(path)
+        if log_dir:  # a bare file name logs to the current directory
+            os.makedirs(log_dir, exist_ok=True)
+        f = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+        atexit.register(f.close)
+        _LOG_HANDLES[path] = f
+    return f
+
 def log(path, user, assistant):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(f"[{datetime.now().isoformat(timespec='seconds')}] USER: {user}\n")
-        f.write(f"[{datetime.now().isoformat(timespec='seconds')}] ASSISTANT: {assistant}\n\n")
+    f = _log_handle(path)
+    ts = datetime.now().isoformat(timespec='seconds')
+    f.write(f"[{ts}] USER: {user}\n[{ts}] ASSISTANT: {assistant}\n\n")
+    f.flush()  # one write syscall per turn, so a killed terminal doesn't lose the transcript
+
+# One alternation covering every step kind, so a query is scanned once; the outer named group
+# (m.lastgroup) tells which kind matched.
+STEP_PATTERN = re.compile(
+    r"(?P<translate>translate\s+'(?P<text>[^']+)'\s+into\s+german)"
+    r"|(?P<add>\badd\s+(?P<add_a>-?\d+(?:\.\d+)?)\s+and\s+(?P<add_b>-?\d+(?:\.\d+)?))"
+    r"|(?P<multiply>\bmultiply\s+(?P<mul_a>-?\d+(?:\.\d+)?)\s+and\s+(?P<mul_b>-?\d+(?:\.\d+)?))"
+    r"|(?P<capital>capital of\s+(?P<country>[a-zA-Z]+))"
+    r"|(?P<distance>distance between earth and mars)"
+)
 
 def detect_steps(query: str) -> List[Dict[str, Any]]:
     """
     Very simple, rule-based step detector.
     Recognizes: translate <text> into German; add A and B; multiply A and B; 'capital of X'; generic question.
+    Steps are returned in the order they appear in the query.
     """
     q = query.strip()
     lower = q.lower()
 
     steps: List[Dict[str, Any]] = []
-
-    # Look for translate commands
-    t_match = re.search(r"translate\s+'([^']+)'\s+into\s+german", lower)
-    if t_match:
-        steps.append({"type":"translate", "text": t_match.group(1)})
-
-    # Additions
-    add_match = re.search(r"\badd\s+(-?\d+(?:\.\d+)?)\s+and\s+(-?\d+(?:\.\d+)?)", lower)
-    if add_match:
-        steps.append({"type":"add", "a": float(add_match.group(1)), "b": float(add_match.group(2))})
-
-    # Multiplications
-    mul_match = re.search(r"\bmultiply\s+(-?\d+(?:\.\d+)?)\s+and\s+(-?\d+(?:\.\d+)?)", lower)
-    if mul_match:
-        steps.append({"type":"multiply", "a": float(mul_match.group(1)), "b": float(mul_match.group(2))})
-
-    # Capitals
-    cap_match = re.search(r"capital of\s+([a-zA-Z]+)", lower)
-    if cap_match:
-        country = cap_match.group(1)
-        steps.append({"type":"fact", "question": f"What is the capital of {country}?"})
-
-    # Distance Earth-Mars or other general
-    if "distance between earth and mars" in lower:
-        steps.append({"type":"fact", "question": "What is the distance between Earth and Mars?"})
+    for m in STEP_PATTERN.finditer(lower):
+        kind = m.lastgroup
+        if kind == "translate":
+            steps.append({"type":"translate", "text": m.group("text")})
+        elif kind == "add":
+            steps.append({"type":"add", "a": float(m.group("add_a")), "b": float(m.group("add_b"))})
+        elif kind == "multiply":
+            steps.append({"type":"multiply", "a": float(m.group("mul_a")), "b": float(m.group("mul_b"))})
+        elif kind == "capital":
+            steps.append({"type":"fact", "question": f"What is the capital of {m.group('country')}?"})
+        else:  # distance Earth-Mars
+            steps.append({"type":"fact", "question": "What is the distance between Earth and Mars?"})
 
     # If nothing matched, treat as a single fact query
     if not steps:
@@ -92,34 +180,42 @@ def detect_steps(query: str) -> List[Dict[str, Any]]:
 
     return steps
 
+def run_step(idx: int, step: Dict[str, Any]) -> Tuple[str, Any]:
+    """Execute a single step; returns its transcript line and result (None if skipped)."""
+    if step["type"] == "add":
+        result = calculator_tool.add(step["a"], step["b"])
+        return f"Step {idx}: Add {step['a']} and {step['b']} -> {result:g}", result
+    if step["type"] == "multiply":
+        result = calculator_tool.multiply(step["a"], step["b"])
+        return f"Step {idx}: Multiply {step['a']} and {step['b']} -> {result:g}", result
+    if step["type"] == "translate":
+        result = translator_tool.translate_en_to_de(step["text"])
+        return f"Step {idx}: Translate '{step['text']}' to German -> {result}", result
+    if step["type"] == "fact":
+        result = call_openai_llm(SYSTEM_PROMPT, step["question"])
+        return f"Step {idx}: LLM fact lookup: '{step['question']}' -> {result}", result
+    return f"Step {idx}: Unknown step type '{step['type']}' (skipped).", None
+
 def run_steps(steps: List[Dict[str, Any]]) -> str:
-    memory: Dict[str, Any] = {}
+    # Detected steps never consume each other's results, so when several LLM lookups are
+    # needed they run concurrently; pool.map still yields outcomes in step order.
+    indices = range(1, len(steps) + 1)
+    if sum(step["type"] == "fact" for step in steps) > 1:
+        with ThreadPoolExecutor(max_workers=len(steps)) as pool:
+            outcomes = list(pool.map(run_step, indices, steps))
+    else:
+        outcomes = list(map(run_step, indices, steps))
+
+    # Transcript and final summary (the memory of step results) are built in one pass;
+    # outcomes are already in step order, so no sort is needed.
     transcript: List[str] = []
-    for idx, step in enumerate(steps, 1):
-        if step["type"] == "add":
-            result = calculator_tool.add(step["a"], step["b"])
-            memory[f"step{idx}"] = result
-            transcript.append(f"Step {idx}: Add {step['a']} and {step['b']} -> {result:g}")
-        elif step["type"] == "multiply":
-            result = calculator_tool.multiply(step["a"], step["b"])
-            memory[f"step{idx}"] = result
-            transcript.append(f"Step {idx}: Multiply {step['a']} and {step['b']} -> {result:g}")
-        elif step["type"] == "translate":
-            result = translator_tool.translate_en_to_de(step["text"])
-            memory[f"step{idx}"] = result
-            transcript.append(f"Step {idx}: Translate '{step['text']}' to German -> {result}")
-        elif step["type"] == "fact":
-            result = call_openai_llm(SYSTEM_PROMPT, step["question"])
-            memory[f"step{idx}"] = result
-            transcript.append(f"Step {idx}: LLM fact lookup: '{step['question']}' -> {result}")
-        else:
-            transcript.append(f"Step {idx}: Unknown step type '{step['type']}' (skipped).")
-
-    # Final summary
     summary_lines = ["\nSummary:"]
-    for k in sorted(memory.keys()):
-        summary_lines.append(f"- {k}: {memory[k]}")
-    return "\n".join(transcript + summary_lines)
+    for idx, (line, result) in enumerate(outcomes, 1):
+        transcript.append(line)
+        if result is not None:
+            summary_lines.append(f"- step{idx}: {result}")
+    transcript.extend(summary_lines)
+    return "\n".join(transcript)
 
 def main():
     print("Level 3 — Full Agent (type 'exit' to quit)")
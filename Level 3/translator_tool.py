@@ -5,6 +5,8 @@ Very simple English→German translator tool for demo.
 - In a real app, you'd call a translation API.
 """
 
+from functools import lru_cache
+
 PHRASES = {
     "good morning": "Guten Morgen",
     "have a nice day": "Einen schönen Tag noch",
@@ -13,6 +15,20 @@ PHRASES = {
     "hi": "Hallo",
 }
 
+# Super crude word mapping for the fallback
+WORDS = {
+    "good": "gut",
+    "morning": "Morgen",
+    "have": "haben",
+    "a": "ein",
+    "nice": "schön",
+    "day": "Tag",
+    "and": "und",
+    "then": "dann",
+    "translate": "übersetzen",
+}
+
+@lru_cache(maxsize=1024)
 def translate_en_to_de(text: str) -> str:
     key = text.strip().lower()
     if key in PHRASES:
@@ -21,18 +37,6 @@ def translate_en_to_de(text: str) -> str:
     words = key.split()
     if not words:
         return ""
-    # Super crude mapping
-    mapping = {
-        "good": "gut",
-        "morning": "Morgen",
-        "have": "haben",
-        "a": "ein",
-        "nice": "schön",
-        "day": "Tag",
-        "and": "und",
-        "then": "dann",
-        "translate": "übersetzen",
-    }
-    out = " ".join(mapping.get(w, w) for w in words)
+    out = " ".join(WORDS.get(w, w) for w in words)
     # Capitalize first letter to resemble German sentence capitalization
     return out[:1].upper() + out[1:]